@@ -24,9 +24,39 @@ function createDeck() {
   return deck;
 }
 
-function shuffle(deck) {
-  for (let i = deck.length - 1; i > 0; i--) {
-    const j = Math.floor(Math.random() * (i + 1));
+// 评估器内部用整数编码牌：code = value<<2 | 花色序号，比较和取值都是纯整数运算
+const SUIT_INDEX = { '♠': 0, '♥': 1, '♦': 2, '♣': 3 };
+function cardCode(c) { return (c.value << 2) | SUIT_INDEX[c.suit]; }
+
+// 52 个牌对象只在启动时构造一次；每手牌复制引用数组再原地洗牌即可。
+// 整数编码缓存在牌对象上（不可枚举，序列化输出不变），并冻结共享对象保证跨房间引用安全
+const DECK_PROTOTYPE = Object.freeze(createDeck().map((c) => {
+  Object.defineProperty(c, 'code', { value: cardCode(c) });
+  return Object.freeze(c);
+}));
+
+// 每张牌的 JSON 串只在启动时生成一次，广播时直接拼接
+const CARD_JSON = {};
+for (const suit of SUITS) {
+  for (const rank of RANKS) {
+    CARD_JSON[rank + suit] = JSON.stringify({ suit, rank, value: RANK_VALUES[rank] });
+  }
+}
+
+function handJson(cards) {
+  if (cards.length === 0) return '[]';
+  let s = '[' + CARD_JSON[cards[0].rank + cards[0].suit];
+  for (let i = 1; i < cards.length; i++) s += ',' + CARD_JSON[cards[i].rank + cards[i].suit];
+  return s + ']';
+}
+
+// Fisher–Yates；游标发牌只消耗前 limit 张时可提前停止，
+// 每个位置仍从剩余全量中等概率选取，前缀分布与全洗一致
+function shuffle(deck, limit = deck.length) {
+  const n = deck.length;
+  const end = Math.min(limit, n - 1);
+  for (let i = 0; i < end; i++) {
+    const j = i + Math.floor(Math.random() * (n - i));
     [deck[i], deck[j]] = [deck[j], deck[i]];
   }
   return deck;
@@ -46,79 +76,161 @@ function getCombinations(arr, k) {
   return result;
 }
 
-// 评估5张牌，返回 [牌型等级, 踢脚...]
-function evaluate5(cards) {
-  const values = cards.map(c => c.value).sort((a, b) => b - a);
-  const suits = cards.map(c => c.suit);
-  const isFlush = suits.every(s => s === suits[0]);
+// 牌堆本体是整数编码的 Uint8Array，洗牌只搬运字节；发牌时经 CARD_BY_CODE 还原为共享牌对象
+const DECK_CODES = new Uint8Array(52);
+const CARD_BY_CODE = new Array(64);
+DECK_PROTOTYPE.forEach((c, i) => {
+  DECK_CODES[i] = c.code;
+  CARD_BY_CODE[c.code] = c;
+});
+
+// 8192 项查找表：13 位牌面掩码 -> 顺子最高牌的点数（无顺子为 0），含 A-5
+const STRAIGHT_HIGH = new Int8Array(8192);
+for (let mask = 0; mask < 8192; mask++) {
+  for (let top = 12; top >= 4; top--) {
+    const run = 0b11111 << (top - 4);
+    if ((mask & run) === run) { STRAIGHT_HIGH[mask] = top + 2; break; }
+  }
+  if (!STRAIGHT_HIGH[mask] && (mask & 0b1000000001111) === 0b1000000001111) STRAIGHT_HIGH[mask] = 5;
+}
 
-  let isStraight = false, straightHigh = 0;
-  const uniq = [...new Set(values)].sort((a, b) => b - a);
-  if (uniq.length === 5) {
-    if (uniq[0] - uniq[4] === 4) { isStraight = true; straightHigh = uniq[0]; }
-    if (uniq[0] === 14 && uniq[1] === 5 && uniq[4] === 2) { isStraight = true; straightHigh = 5; }
+// Cactus-Kev 式分值表：五张面值互异的掩码（C(13,5)=1287 个）直接映射到最终分值，
+// 同花/非同花各一张表，评估时一次下标取代全部分支
+const FLUSH_SCORE = new Int32Array(8192);
+const UNIQUE5_SCORE = new Int32Array(8192);
+for (let mask = 0; mask < 8192; mask++) {
+  let bits = 0, singles = 0;
+  for (let v = 14; v >= 2; v--) {
+    if (mask & (1 << (v - 2))) { bits++; singles = (singles << 4) | v; }
   }
+  if (bits !== 5) continue;
+  const sh = STRAIGHT_HIGH[mask];
+  UNIQUE5_SCORE[mask] = sh ? (5 << 20) | (sh << 16) : (1 << 20) | singles;
+  FLUSH_SCORE[mask] = sh ? (9 << 20) | (sh << 16) : (6 << 20) | singles;
+}
 
-  if (isFlush && isStraight) return [9, straightHigh];
+// 评估5张牌（整数编码），返回单个整数分值：牌型等级占高位，踢脚按 4 bit 依次打包，
+// 比较两手牌强弱就是一次整数比较
+function evaluate5(codes, flushPossible = true) {
+  const counts = COUNT_SCRATCH;
+  counts.fill(0);
+  let rankMask = 0, distinct = 0, isFlush = flushPossible;
+  const suit0 = codes[0] & 3;
+  for (let i = 0; i < 5; i++) {
+    const v = codes[i] >> 2;
+    if (counts[v]++ === 0) distinct++;
+    rankMask |= 1 << (v - 2);
+    if (isFlush && (codes[i] & 3) !== suit0) isFlush = false;
+  }
 
-  const counts = {};
-  for (const v of values) counts[v] = (counts[v] || 0) + 1;
-  const ce = Object.entries(counts).map(([v,c]) => [parseInt(v), c])
-    .sort((a,b) => (b[1] !== a[1] ? b[1]-a[1] : b[0]-a[0]));
+  // 面值互异（含同花）的牌型整体查表；剩下的必然带对子，走计数分组
+  if (isFlush) return FLUSH_SCORE[rankMask];
+  if (distinct === 5) return UNIQUE5_SCORE[rankMask];
+
+  let quad = 0, trip = 0, pairHigh = 0, pairLow = 0, singles = 0;
+  for (let v = 14; v >= 2; v--) {
+    const c = counts[v];
+    if (c === 0) continue;
+    if (c === 4) quad = v;
+    else if (c === 3) trip = v;
+    else if (c === 2) { if (!pairHigh) pairHigh = v; else pairLow = v; }
+    else singles = (singles << 4) | v;
+  }
 
-  if (ce[0][1] === 4) return [8, ce[0][0], ce[1][0]];
-  if (ce[0][1] === 3 && ce[1][1] === 2) return [7, ce[0][0], ce[1][0]];
-  if (isFlush) return [6, ...values];
-  if (isStraight) return [5, straightHigh];
-  if (ce[0][1] === 3) return [4, ce[0][0], ...ce.slice(1).map(e => e[0])];
-  if (ce[0][1] === 2 && ce[1][1] === 2) return [3, ce[0][0], ce[1][0], ce[2][0]];
-  if (ce[0][1] === 2) return [2, ce[0][0], ...ce.slice(1).map(e => e[0])];
-  return [1, ...values];
+  if (quad) return (8 << 20) | (quad << 16) | (singles << 12);
+  if (trip && pairHigh) return (7 << 20) | (trip << 16) | (pairHigh << 12);
+  if (trip) return (4 << 20) | (trip << 16) | (singles << 8);
+  if (pairLow) return (3 << 20) | (pairHigh << 16) | (pairLow << 12) | (singles << 8);
+  return (2 << 20) | (pairHigh << 16) | (singles << 4);
 }
 
-function evaluate7(cards7) {
-  let best = null;
-  for (const combo of getCombinations(cards7, 5)) {
-    const rank = evaluate5(combo);
-    if (!best || compareRanks(rank, best) > 0) best = rank;
+// 7 选 5 的 21 组下标只在启动时枚举一次，摊平成 105 字节的 Int8Array 顺序访问；
+// 评估时复用同一个 5 槽暂存数组填充，热路径上不再构造组合数组
+const SUBSETS_5_OF_7 = Int8Array.from(getCombinations([0, 1, 2, 3, 4, 5, 6], 5).flat());
+const EVAL_SCRATCH = new Array(5);
+// 点数计数暂存：按 2..14 直接下标，评估时只清零不再分配
+const COUNT_SCRATCH = new Int8Array(15);
+// 排序比较器提升到模块层，避免热路径上每次分配闭包
+const ASC = (a, b) => a - b;
+const BY_TOTAL_BET = (a, b) => a.totalBet - b.totalBet;
+
+// 相同七张牌（如共享公共牌的多次摊牌）直接复用评估结果；满了整体清空保持简单
+const EVAL_CACHE = new Map();
+const EVAL_CACHE_MAX = 4096;
+
+function evaluate7Codes(codes7) {
+  // 规范化键：排序后按 6 bit 一张打包成整数（7*6=42 位，在双精度安全范围内）
+  const sorted = codes7.slice().sort(ASC);
+  let key = 0;
+  for (const c of sorted) key = key * 64 + c;
+  const hit = EVAL_CACHE.get(key);
+  if (hit) return hit;
+
+  // 七张牌里没有任何花色达到 5 张时，21 个组合都不可能成同花，统一跳过花色比较
+  let s0 = 0, s1 = 0, s2 = 0, s3 = 0;
+  for (const c of codes7) {
+    const suit = c & 3;
+    if (suit === 0) s0++; else if (suit === 1) s1++; else if (suit === 2) s2++; else s3++;
   }
-  return best;
-}
+  const flushPossible = s0 >= 5 || s1 >= 5 || s2 >= 5 || s3 >= 5;
 
-function compareRanks(a, b) {
-  for (let i = 0; i < Math.max(a.length, b.length); i++) {
-    const av = a[i] || 0, bv = b[i] || 0;
-    if (av > bv) return 1;
-    if (av < bv) return -1;
+  let best = 0;
+  for (let base = 0; base < SUBSETS_5_OF_7.length; base += 5) {
+    for (let i = 0; i < 5; i++) EVAL_SCRATCH[i] = codes7[SUBSETS_5_OF_7[base + i]];
+    const rank = evaluate5(EVAL_SCRATCH, flushPossible);
+    if (rank > best) best = rank;
   }
-  return 0;
+  if (EVAL_CACHE.size >= EVAL_CACHE_MAX) EVAL_CACHE.clear();
+  EVAL_CACHE.set(key, best);
+  return best;
 }
 
+
 // ============ 游戏状态 ============
 const rooms = new Map();
 const clients = new Map();
 
 function genId() { return Math.random().toString(36).substring(2, 8).toUpperCase(); }
+// 状态变更时递增版本号，broadcastState 据此复用缓存的公共状态 JSON
+function touchState(room) { room.stateVersion++; }
 function broadcast(room, msg) {
-  const data = JSON.stringify(msg);
+  // 预编码成 Buffer，N 个接收者只做一次 UTF-8 编码（binary:false 保持文本帧）
+  const data = Buffer.from(JSON.stringify(msg));
   for (const p of room.players) {
-    if (p.ws && p.ws.readyState === WebSocket.OPEN) p.ws.send(data);
+    if (p.ws && p.ws.readyState === WebSocket.OPEN) p.ws.send(data, { binary: false });
   }
 }
 function send(ws, msg) { if (ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify(msg)); }
+function sendRaw(ws, data) { if (ws.readyState === WebSocket.OPEN) ws.send(data); }
+
+// 固定文案的错误消息只在启动时序列化一次
+const ERR_ROOM_NOT_FOUND = JSON.stringify({ type: 'error', message: '房间不存在' });
+const ERR_GAME_STARTED = JSON.stringify({ type: 'error', message: '游戏已开始，如之前断开请用相同名字重新加入' });
+const ERR_ROOM_FULL = JSON.stringify({ type: 'error', message: '房间已满' });
+const ERR_NEED_CALL = JSON.stringify({ type: 'error', message: '需要跟注或加注' });
+const ERR_RAISE_TOO_LOW = JSON.stringify({ type: 'error', message: '加注额必须高于当前最高下注' });
+const ERR_NO_CHIPS = JSON.stringify({ type: 'error', message: '筹码不足' });
+
+// 统一的玩家构造，保证两处入座路径生成同一对象形状（利于引擎内联缓存）
+function createPlayer(id, name, ws, isHost, seat) {
+  return { id, name, chips: 1000, hand: [], handJson: '[]', streetBet: 0, totalBet: 0,
+    folded: false, allIn: false, hasActed: false, ws, isHost, seat };
+}
 
 function createRoom(ws, name) {
   const roomId = genId();
   const playerId = genId();
   const room = {
-    id: roomId, players: [], status: 'waiting',
-    deck: [], communityCards: [], pot: 0, street: null,
+    id: roomId, players: [], playersById: new Map(), status: 'waiting',
+    deck: new Uint8Array(DECK_CODES), deckTop: 0,
+    communityCards: [null, null, null, null, null], ccCount: 0, pot: 0, street: null,
     currentPlayerIndex: -1, dealerIndex: -1,
-    smallBlind: 10, bigBlind: 20, streetHighestBet: 0, minRaise: 20,
+    smallBlind: 10, bigBlind: 20, streetHighestBet: 0, minRaise: 20, activeCount: 0,
+    stateVersion: 0, cachedStateVersion: -1, cachedStatePrefix: '', nextHandTimer: null,
   };
-  const host = { id: playerId, name, chips: 1000, hand: [], streetBet: 0, totalBet: 0,
-    folded: false, allIn: false, hasActed: false, ws, isHost: true, seat: 0 };
+  const host = createPlayer(playerId, name, ws, true, 0);
   room.players.push(host);
+  room.playersById.set(playerId, host);
   rooms.set(roomId, room);
   clients.set(ws, { playerId, roomId });
   send(ws, { type: 'joined', roomId, playerId, isHost: true });
@@ -129,25 +241,27 @@ function createRoom(ws, name) {
 function joinRoom(ws, roomId, name) {
   roomId = roomId.toUpperCase();
   const room = rooms.get(roomId);
-  if (!room) { send(ws, { type: 'error', message: '房间不存在' }); return; }
+  if (!room) { sendRaw(ws, ERR_ROOM_NOT_FOUND); return; }
 
   // 重连：同名且断开
   const dc = room.players.find(p => p.name === name && !p.ws);
   if (dc) {
     dc.ws = ws;
+    touchState(room);
     clients.set(ws, { playerId: dc.id, roomId });
     send(ws, { type: 'joined', roomId, playerId: dc.id, isHost: dc.isHost });
     broadcastState(room);
     return;
   }
 
-  if (room.status !== 'waiting') { send(ws, { type: 'error', message: '游戏已开始，如之前断开请用相同名字重新加入' }); return; }
-  if (room.players.length >= 9) { send(ws, { type: 'error', message: '房间已满' }); return; }
+  if (room.status !== 'waiting') { sendRaw(ws, ERR_GAME_STARTED); return; }
+  if (room.players.length >= 9) { sendRaw(ws, ERR_ROOM_FULL); return; }
 
   const playerId = genId();
-  const p = { id: playerId, name, chips: 1000, hand: [], streetBet: 0, totalBet: 0,
-    folded: false, allIn: false, hasActed: false, ws, isHost: false, seat: room.players.length };
+  const p = createPlayer(playerId, name, ws, false, room.players.length);
   room.players.push(p);
+  room.playersById.set(playerId, p);
+  touchState(room);
   clients.set(ws, { playerId, roomId });
   send(ws, { type: 'joined', roomId, playerId, isHost: false });
   broadcastState(room);
@@ -159,42 +273,56 @@ function leaveRoom(ws) {
   const { playerId, roomId } = c;
   const room = rooms.get(roomId);
   if (!room) return;
-  const idx = room.players.findIndex(p => p.id === playerId);
-  if (idx === -1) return;
-  const p = room.players[idx];
+  const p = room.playersById.get(playerId);
+  if (!p) return;
 
+  touchState(room);
   if (room.status === 'waiting') {
-    room.players.splice(idx, 1);
+    room.players.splice(room.players.indexOf(p), 1);
+    room.playersById.delete(playerId);
     room.players.forEach((pl, i) => pl.seat = i);
     if (room.players.length === 0) rooms.delete(roomId);
     else broadcastState(room);
   } else {
     p.ws = null;
-    p.folded = true;
+    if (!p.folded) { p.folded = true; room.activeCount--; }
     checkAdvance(room);
   }
   clients.delete(ws);
 }
 
 function broadcastState(room) {
-  const pub = getPublicState(room);
+  // 公共部分连同消息包装一起缓存成现成前缀，广播时只拼接私有字段
+  if (room.cachedStateVersion !== room.stateVersion) {
+    room.cachedStatePrefix = '{"type":"state","state":' + JSON.stringify(getPublicState(room)).slice(0, -1);
+    room.cachedStateVersion = room.stateVersion;
+  }
+  const prefix = room.cachedStatePrefix;
+  const curId = room.currentPlayerIndex >= 0 ? room.players[room.currentPlayerIndex]?.id : null;
   for (const p of room.players) {
-    const ps = { ...pub, yourHand: p.hand, yourId: p.id,
-      yourTurn: room.currentPlayerIndex >= 0 && room.players[room.currentPlayerIndex]?.id === p.id };
-    if (p.ws && p.ws.readyState === WebSocket.OPEN) p.ws.send(JSON.stringify({ type: 'state', state: ps }));
+    if (!p.ws || p.ws.readyState !== WebSocket.OPEN) continue;
+    p.ws.send(prefix +
+      ',"yourHand":' + p.handJson +
+      ',"yourId":' + JSON.stringify(p.id) +
+      ',"yourTurn":' + (p.id === curId) + '}}');
   }
 }
 
+// 顶层函数复用，避免每次序列化都重建闭包，对象字段顺序固定保证形状稳定
+function toPublicPlayer(p) {
+  return {
+    id: p.id, name: p.name, chips: p.chips, streetBet: p.streetBet,
+    totalBet: p.totalBet, folded: p.folded, allIn: p.allIn,
+    hasActed: p.hasActed, isHost: p.isHost, seat: p.seat,
+    handCount: p.hand.length, connected: !!p.ws,
+  };
+}
+
 function getPublicState(room) {
   return {
     roomId: room.id, status: room.status,
-    players: room.players.map(p => ({
-      id: p.id, name: p.name, chips: p.chips, streetBet: p.streetBet,
-      totalBet: p.totalBet, folded: p.folded, allIn: p.allIn,
-      hasActed: p.hasActed, isHost: p.isHost, seat: p.seat,
-      handCount: p.hand.length, connected: !!p.ws,
-    })),
-    communityCards: room.communityCards, pot: room.pot, street: room.street,
+    players: room.players.map(toPublicPlayer),
+    communityCards: room.communityCards.slice(0, room.ccCount), pot: room.pot, street: room.street,
     currentPlayerIndex: room.currentPlayerIndex, dealerIndex: room.dealerIndex,
     smallBlind: room.smallBlind, bigBlind: room.bigBlind,
     streetHighestBet: room.streetHighestBet, minRaise: room.minRaise,
@@ -203,7 +331,11 @@ function getPublicState(room) {
 }
 
 // ============ 游戏逻辑 ============
+// 街道推进表：当前街道 -> [发牌数, 下一街道]
+const STREET_NEXT = { preflop: [3, 'flop'], flop: [1, 'turn'], turn: [1, 'river'] };
+
 function startGame(room) {
+  if (room.status !== 'waiting') return;
   if (room.players.length < 2) return { error: '至少需要2名玩家' };
   room.status = 'playing';
   room.dealerIndex = 0;
@@ -211,6 +343,7 @@ function startGame(room) {
 }
 
 function startNewHand(room) {
+  touchState(room);
   const eligible = room.players.filter(p => p.chips > 0);
   if (eligible.length < 2) {
     room.status = 'waiting';
@@ -218,21 +351,32 @@ function startNewHand(room) {
     return;
   }
 
-  room.deck = shuffle(createDeck());
-  room.communityCards = [];
+  // 牌堆缓冲随房间分配一次，换手只原地重洗；一手最多消耗 2N+5 张，只洗这一段
+  shuffle(room.deck, 2 * eligible.length + 5);
+  room.deckTop = 0;
+  room.communityCards.fill(null);
+  room.ccCount = 0;
   room.pot = 0;
   room.street = 'preflop';
   room.streetHighestBet = 0;
   room.minRaise = room.bigBlind;
 
+  // 底牌直接按游标从编码牌堆还原到手牌槽位，不经过中间批量数组
+  let next = room.deckTop;
+  room.deckTop += 2 * eligible.length;
   for (const p of room.players) {
     if (p.chips <= 0) {
-      p.hand = []; p.streetBet = 0; p.totalBet = 0;
-      p.folded = true; p.allIn = false; p.hasActed = true;
+      p.hand.length = 0;
+      p.handJson = '[]';
+      resetPlayerForHand(p, false);
     } else {
-      p.hand = [room.deck.pop(), room.deck.pop()];
-      p.streetBet = 0; p.totalBet = 0;
-      p.folded = false; p.allIn = false; p.hasActed = false;
+      // 手牌固定两张：复用既有数组按槽位写入，不再每手分配新数组
+      p.hand.length = 2;
+      p.hand[0] = CARD_BY_CODE[room.deck[next++]];
+      p.hand[1] = CARD_BY_CODE[room.deck[next++]];
+      // 手牌只在发牌时变化，JSON 片段随之缓存，广播时直接拼接
+      p.handJson = handJson(p.hand);
+      resetPlayerForHand(p, true);
     }
   }
 
@@ -245,6 +389,7 @@ function startNewHand(room) {
     bbIdx = (room.dealerIndex + 2) % room.players.length;
   }
 
+  room.activeCount = eligible.length;
   placeBet(room.players[sbIdx], room.smallBlind, room);
   placeBet(room.players[bbIdx], room.bigBlind, room);
   room.streetHighestBet = room.bigBlind;
@@ -254,8 +399,18 @@ function startNewHand(room) {
   broadcastState(room);
 }
 
+// 每手开始时的玩家状态重置集中在一处；未发牌的玩家直接视为已弃牌、已行动
+function resetPlayerForHand(p, dealtIn) {
+  p.streetBet = 0;
+  p.totalBet = 0;
+  p.folded = !dealtIn;
+  p.allIn = false;
+  p.hasActed = !dealtIn;
+}
+
 function placeBet(p, amt, room) {
   const actual = Math.min(amt, p.chips);
+  if (actual <= 0) return;
   p.chips -= actual;
   p.streetBet += actual;
   p.totalBet += actual;
@@ -282,11 +437,11 @@ function handleAction(room, playerId, action) {
 
   switch (type) {
     case 'fold': {
-      cur.folded = true; cur.hasActed = true; break;
+      cur.folded = true; room.activeCount--; cur.hasActed = true; break;
     }
     case 'check': {
       if (cur.streetBet < room.streetHighestBet) {
-        send(cur.ws, { type: 'error', message: '需要跟注或加注' }); return;
+        sendRaw(cur.ws, ERR_NEED_CALL); return;
       }
       cur.hasActed = true; break;
     }
@@ -299,13 +454,13 @@ function handleAction(room, playerId, action) {
     case 'raise': {
       const raiseTo = amount;
       if (raiseTo <= room.streetHighestBet) {
-        send(cur.ws, { type: 'error', message: '加注额必须高于当前最高下注' }); return;
+        sendRaw(cur.ws, ERR_RAISE_TOO_LOW); return;
       }
       if (raiseTo < room.streetHighestBet + room.minRaise) {
         send(cur.ws, { type: 'error', message: `最小加注到 ${room.streetHighestBet + room.minRaise}` }); return;
       }
       const addAmt = raiseTo - cur.streetBet;
-      if (addAmt > cur.chips) { send(cur.ws, { type: 'error', message: '筹码不足' }); return; }
+      if (addAmt > cur.chips) { sendRaw(cur.ws, ERR_NO_CHIPS); return; }
       for (const p of room.players) {
         if (!p.folded && !p.allIn && p.id !== cur.id) p.hasActed = false;
       }
@@ -329,21 +484,26 @@ function handleAction(room, playerId, action) {
       cur.hasActed = true; break;
     }
   }
+  touchState(room);
   checkAdvance(room);
 }
 
 function checkAdvance(room) {
-  const active = room.players.filter(p => !p.folded);
-  if (active.length === 1) {
-    endHand(room, active, '其他玩家弃牌');
+  // 非进行中状态（如摊牌展示期间有人离开）不得重复推进/重复派彩
+  if (room.status !== 'playing') return;
+  // 未弃牌人数由 activeCount 实时维护，无需每次重新扫描
+  if (room.activeCount === 1) {
+    endHand(room, room.players.filter(p => !p.folded), '其他玩家弃牌');
     return;
   }
 
-  const nonAllIn = active.filter(p => !p.allIn);
-  const needAction = nonAllIn.filter(p => !p.hasActed);
-  const allMatched = nonAllIn.every(p => p.streetBet === room.streetHighestBet);
-
-  if (needAction.length === 0 && allMatched) {
+  // 一趟扫描判定本轮是否结束：还有人未行动或下注未补齐则继续
+  let roundDone = true;
+  for (const p of room.players) {
+    if (p.folded || p.allIn) continue;
+    if (!p.hasActed || p.streetBet !== room.streetHighestBet) { roundDone = false; break; }
+  }
+  if (roundDone) {
     endStreet(room);
     return;
   }
@@ -357,29 +517,27 @@ function checkAdvance(room) {
   if (!found) { endStreet(room); return; }
 
   room.currentPlayerIndex = nextIdx;
+  touchState(room);
   broadcastState(room);
 }
 
+// 翻牌/转牌/河牌共用的发公共牌路径：按推进表补发到固定 5 槽缓冲并前移街道
+function dealBoard(room) {
+  const [cardsToDeal, nextStreet] = STREET_NEXT[room.street];
+  for (let i = 0; i < cardsToDeal; i++) {
+    room.communityCards[room.ccCount++] = CARD_BY_CODE[room.deck[room.deckTop++]];
+  }
+  room.street = nextStreet;
+}
+
 function endStreet(room) {
+  touchState(room);
   for (const p of room.players) { p.streetBet = 0; p.hasActed = false; }
   room.streetHighestBet = 0;
   room.minRaise = room.bigBlind;
 
-  const streets = ['preflop', 'flop', 'turn', 'river'];
-  const idx = streets.indexOf(room.street);
-
-  if (room.street === 'preflop') {
-    room.communityCards.push(room.deck.pop(), room.deck.pop(), room.deck.pop());
-    room.street = 'flop';
-  } else if (room.street === 'flop') {
-    room.communityCards.push(room.deck.pop());
-    room.street = 'turn';
-  } else if (room.street === 'turn') {
-    room.communityCards.push(room.deck.pop());
-    room.street = 'river';
-  } else if (room.street === 'river') {
-    showdown(room); return;
-  }
+  if (room.street === 'river') { showdown(room); return; }
+  dealBoard(room);
 
   room.currentPlayerIndex = (room.dealerIndex + 1) % room.players.length;
   const hasNext = skipInactive(room);
@@ -392,9 +550,10 @@ function endStreet(room) {
 }
 
 function showdown(room) {
+  touchState(room);
   room.status = 'showdown';
   const active = room.players.filter(p => !p.folded);
-  const sorted = [...room.players].sort((a, b) => a.totalBet - b.totalBet);
+  const sorted = [...room.players].sort(BY_TOTAL_BET);
   let prevBet = 0;
   const pots = [];
 
@@ -408,14 +567,32 @@ function showdown(room) {
     }
   }
 
+  // 每个玩家的七张牌只评估一次，各边池分配时复用结果；
+  // 公共牌编码为各玩家共享，只有两张底牌逐人替换
+  const scratch = new Array(7);
+  for (let i = 0; i < 5; i++) scratch[i + 2] = room.communityCards[i].code;
+  const rankOf = new Map();
+  for (const p of active) {
+    scratch[0] = p.hand[0].code;
+    scratch[1] = p.hand[1].code;
+    rankOf.set(p.id, evaluate7Codes(scratch));
+  }
+
   const allWinners = new Set();
   for (const pot of pots) {
-    let best = null, winners = [];
+    // 只有一人有资格的边池（未被跟注的超额部分）直接入账，跳过评牌
+    if (pot.eligible.length === 1) {
+      const only = room.playersById.get(pot.eligible[0]);
+      only.chips += pot.size;
+      allWinners.add(only.id);
+      continue;
+    }
+    let best = 0, winners = [];
     for (const p of active) {
       if (!pot.eligible.includes(p.id)) continue;
-      const rank = evaluate7([...p.hand, ...room.communityCards]);
-      if (!best || compareRanks(rank, best) > 0) { best = rank; winners = [p]; }
-      else if (compareRanks(rank, best) === 0) winners.push(p);
+      const rank = rankOf.get(p.id);
+      if (rank > best) { best = rank; winners = [p]; }
+      else if (rank === best) winners.push(p);
     }
     const share = Math.floor(pot.size / winners.length);
     const rem = pot.size % winners.length;
@@ -429,13 +606,15 @@ function showdown(room) {
     type: 'showdown',
     winners: Array.from(allWinners),
     hands: active.map(p => ({ playerId: p.id, hand: p.hand })),
-    communityCards: room.communityCards,
+    communityCards: room.communityCards.slice(0, room.ccCount),
   });
   broadcastState(room);
-  setTimeout(() => prepareNextHand(room), 6000);
+  if (room.nextHandTimer) clearTimeout(room.nextHandTimer);
+  room.nextHandTimer = setTimeout(() => prepareNextHand(room), 6000);
 }
 
 function endHand(room, winners, reason) {
+  touchState(room);
   const share = Math.floor(room.pot / winners.length);
   const rem = room.pot % winners.length;
   for (let i = 0; i < winners.length; i++) winners[i].chips += share + (i < rem ? 1 : 0);
@@ -446,15 +625,23 @@ function endHand(room, winners, reason) {
     winners: winners.map(w => w.id),
     reason,
     hands: room.players.filter(p => !p.folded).map(p => ({ playerId: p.id, hand: p.hand })),
-    communityCards: room.communityCards,
+    communityCards: room.communityCards.slice(0, room.ccCount),
   });
   broadcastState(room);
-  setTimeout(() => prepareNextHand(room), 6000);
+  if (room.nextHandTimer) clearTimeout(room.nextHandTimer);
+  room.nextHandTimer = setTimeout(() => prepareNextHand(room), 6000);
 }
 
 function prepareNextHand(room) {
+  room.nextHandTimer = null;
+  touchState(room);
+  // 全员断线时停止自动开局，等待有人重连后由房主重新开始
+  if (!room.players.some(p => p.ws)) { room.status = 'waiting'; return; }
   if (room.players.length < 2) { room.status = 'waiting'; broadcastState(room); return; }
   room.dealerIndex = (room.dealerIndex + 1) % room.players.length;
+  for (const p of room.players) {
+    if (p.chips <= 0 && !p.ws) room.playersById.delete(p.id);
+  }
   room.players = room.players.filter(p => p.chips > 0 || p.ws);
   if (room.players.length < 2) { room.status = 'waiting'; broadcastState(room); return; }
   room.players.forEach((p, i) => p.seat = i);
@@ -465,46 +652,59 @@ function prepareNextHand(room) {
 // ============ WebSocket ============
 const wss = new WebSocket.Server({ noServer: true });
 
+// 消息分发表：一次哈希查找取代逐个类型比较
+const MESSAGE_HANDLERS = {
+  __proto__: null,
+  create_room(ws, msg) {
+    createRoom(ws, msg.name);
+  },
+  join_room(ws, msg) {
+    joinRoom(ws, msg.roomId, msg.name);
+  },
+  start_game(ws, msg, c) {
+    if (!c) return;
+    const room = rooms.get(c.roomId);
+    if (!room) return;
+    const p = room.playersById.get(c.playerId);
+    if (!p?.isHost) return;
+    const r = startGame(room);
+    if (r?.error) send(ws, { type: 'error', message: r.error });
+  },
+  action(ws, msg, c) {
+    if (!c) return;
+    const room = rooms.get(c.roomId);
+    if (!room) return;
+    handleAction(room, c.playerId, msg.action);
+  },
+  rebuy(ws, msg, c) {
+    if (!c) return;
+    const room = rooms.get(c.roomId);
+    if (!room) return;
+    const p = room.playersById.get(c.playerId);
+    if (p) { p.chips = 1000; touchState(room); broadcastState(room); }
+  },
+};
+
+function relayVoice(ws, msg, c) {
+  if (!c) return;
+  const room = rooms.get(c.roomId);
+  if (!room) return;
+  const data = Buffer.from(JSON.stringify({ ...msg, from: c.playerId }));
+  for (const p of room.players) {
+    if (p.id !== c.playerId && p.ws && p.ws.readyState === WebSocket.OPEN) {
+      p.ws.send(data, { binary: false });
+    }
+  }
+}
+
 wss.on('connection', (ws) => {
   ws.on('message', (data) => {
     try {
       const msg = JSON.parse(data);
       const c = clients.get(ws);
-
-      if (msg.type === 'create_room') {
-        createRoom(ws, msg.name);
-      } else if (msg.type === 'join_room') {
-        joinRoom(ws, msg.roomId, msg.name);
-      } else if (msg.type === 'start_game') {
-        if (!c) return;
-        const room = rooms.get(c.roomId);
-        if (!room) return;
-        const p = room.players.find(pl => pl.id === c.playerId);
-        if (!p?.isHost) return;
-        const r = startGame(room);
-        if (r?.error) send(ws, { type: 'error', message: r.error });
-      } else if (msg.type === 'action') {
-        if (!c) return;
-        const room = rooms.get(c.roomId);
-        if (!room) return;
-        handleAction(room, c.playerId, msg.action);
-      } else if (msg.type === 'rebuy') {
-        if (!c) return;
-        const room = rooms.get(c.roomId);
-        if (!room) return;
-        const p = room.players.find(pl => pl.id === c.playerId);
-        if (p) { p.chips = 1000; broadcastState(room); }
-      } else if (msg.type.startsWith('voice_')) {
-        if (!c) return;
-        const room = rooms.get(c.roomId);
-        if (!room) return;
-        const data = JSON.stringify({ ...msg, from: c.playerId });
-        for (const p of room.players) {
-          if (p.id !== c.playerId && p.ws && p.ws.readyState === WebSocket.OPEN) {
-            p.ws.send(data);
-          }
-        }
-      }
+      const handler = MESSAGE_HANDLERS[msg.type];
+      if (handler) handler(ws, msg, c);
+      else if (msg.type.startsWith('voice_')) relayVoice(ws, msg, c);
     } catch (e) { console.error('msg err', e); }
   });
   ws.on('close', () => leaveRoom(ws));
@@ -512,11 +712,22 @@ wss.on('connection', (ws) => {
 });
 
 // ============ HTTP/HTTPS ============
+let indexHtmlCache = null;
 function requestHandler(req, res) {
   if (req.url === '/' || req.url === '/index.html') {
+    // 首次读取后缓存在内存，后续请求不再走文件系统
+    if (indexHtmlCache) {
+      res.writeHead(200, { 'Content-Type': 'text/html' });
+      res.end(indexHtmlCache);
+      return;
+    }
     fs.readFile(path.join(__dirname, 'public', 'index.html'), (err, data) => {
       if (err) { res.writeHead(500); res.end('Error'); }
-      else { res.writeHead(200, { 'Content-Type': 'text/html' }); res.end(data); }
+      else {
+        indexHtmlCache = data;
+        res.writeHead(200, { 'Content-Type': 'text/html' });
+        res.end(data);
+      }
     });
   } else {
     res.writeHead(404); res.end('Not Found');
@@ -530,6 +741,13 @@ function redirectHandler(req, res) {
   res.end();
 }
 
+// 两种部署形态共用同一段 WebSocket 升级逻辑
+function attachWebSocket(server) {
+  server.on('upgrade', (req, socket, head) => {
+    wss.handleUpgrade(req, socket, head, (ws) => wss.emit('connection', ws, req));
+  });
+}
+
 if (hasSSL) {
   const net = require('net');
   const http = require('http');
@@ -541,9 +759,7 @@ if (hasSSL) {
     cert: fs.readFileSync(sslCertPath),
   }, requestHandler);
 
-  httpsServer.on('upgrade', (req, socket, head) => {
-    wss.handleUpgrade(req, socket, head, (ws) => wss.emit('connection', ws, req));
-  });
+  attachWebSocket(httpsServer);
 
   const server = net.createServer((socket) => {
     socket.once('data', (buffer) => {
@@ -565,9 +781,7 @@ if (hasSSL) {
 } else {
   const http = require('http');
   const server = http.createServer(requestHandler);
-  server.on('upgrade', (req, socket, head) => {
-    wss.handleUpgrade(req, socket, head, (ws) => wss.emit('connection', ws, req));
-  });
+  attachWebSocket(server);
   server.listen(PORT, () => {
     console.log(`Texas Poker Server running on http://0.0.0.0:${PORT}`);
   });